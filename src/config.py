@@ -1,9 +1,9 @@
 import os
+from dataclasses import dataclass
+from functools import lru_cache
 from dotenv import load_dotenv
 from urllib.parse import quote_plus
 
-load_dotenv()
-
 # REFATORAR os.path PARA pathlib
 # from pathlib import Path
 #
@@ -35,6 +35,9 @@ ANVISA_FILENAME = "DADOS_ABERTOS_MEDICAMENTOS.csv"
 # Nome do arquivo unificado a ser gerado
 UNIFIED_FILENAME = "ANVISA_CMED_UNIFICADO.csv"
 
+# Nome da cópia em Parquet do arquivo unificado
+UNIFIED_PARQUET_FILENAME = "ANVISA_CMED_UNIFICADO.parquet"
+
 # URL direta para o arquivo csv da ANVISA
 ANVISA_CSV_URL = "https://dados.anvisa.gov.br/dados/DADOS_ABERTOS_MEDICAMENTOS.csv"
 
@@ -42,30 +45,79 @@ ANVISA_CSV_URL = "https://dados.anvisa.gov.br/dados/DADOS_ABERTOS_MEDICAMENTOS.c
 CMED_BASE_URL = "https://www.gov.br"
 CMED_PRICES_PAGE_URL = f"{CMED_BASE_URL}/anvisa/pt-br/assuntos/medicamentos/cmed/precos"
 
-# configurações do Banco de Dados PostgreSQL
-DB_USER = os.getenv("POSTGRES_USER")
-DB_PASSWORD = quote_plus(os.getenv("POSTGRES_PASSWORD"))
-DB_NAME = os.getenv("POSTGRES_DB")
-DB_HOST = os.getenv("DB_HOST")
-DB_PORT = os.getenv("DB_PORT")
+# agrupa as configurações derivadas de variáveis de ambiente.
+# imutável (frozen) para que nenhuma etapa do pipeline altere a configuração em runtime.
+@dataclass(frozen=True, slots=True)
+class Settings:
+    db_user: str
+    db_password: str
+    db_name: str
+    db_host: str
+    db_port: str
+    db_table_name: str
+    database_url: str
+    es_host: str
+    es_port: int
+    es_url: str
+    es_index_name: str
+
+
+# carrega o .env e monta o objeto de configurações uma única vez por processo.
+# o lru_cache garante que reimportações/chamadas repetidas não paguem novo parse.
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    load_dotenv()
+
+    db_user = os.getenv("POSTGRES_USER")
+    db_password = quote_plus(os.getenv("POSTGRES_PASSWORD"))
+    db_name = os.getenv("POSTGRES_DB")
+    db_host = os.getenv("DB_HOST")
+    db_port = os.getenv("DB_PORT")
+    es_host = os.getenv("ES_HOST")
+    es_port = int(os.getenv("ES_PORT"))
+
+    return Settings(
+        db_user=db_user,
+        db_password=db_password,
+        db_name=db_name,
+        db_host=db_host,
+        db_port=db_port,
+        db_table_name=os.getenv("DB_TABLE_NAME"),
+        # string de conexão para o SQLAlchemy
+        database_url=f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}",
+        es_host=es_host,
+        es_port=es_port,
+        es_url=f"http://{es_host}:{es_port}",
+        es_index_name=os.getenv("ES_INDEX_NAME"),
+    )
+
+
+settings = get_settings()
+
+# constantes mantidas para compatibilidade com os módulos que usam config.<NOME>
+DB_USER = settings.db_user
+DB_PASSWORD = settings.db_password
+DB_NAME = settings.db_name
+DB_HOST = settings.db_host
+DB_PORT = settings.db_port
 
 # Refere-se à tabela de medicamentos
-DB_TABLE_NAME = os.getenv("DB_TABLE_NAME")
+DB_TABLE_NAME = settings.db_table_name
 
-# string de conexão para o SQLAlchemy
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+DATABASE_URL = settings.database_url
 
 # configurações do Elasticsearch
-ES_HOST = os.getenv("ES_HOST")
-ES_PORT = int(os.getenv("ES_PORT"))
-ES_URL = f"http://{ES_HOST}:{ES_PORT}"
+ES_HOST = settings.es_host
+ES_PORT = settings.es_port
+ES_URL = settings.es_url
 
 # Refere-se ao índice de medicamentos
-ES_INDEX_NAME = os.getenv("ES_INDEX_NAME")
-
-# garante que o diretório de dados exista
-os.makedirs(DATA_DIR, exist_ok=True)
-os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
-
-# Garante que o diretório de dados manuais exista
-os.makedirs(MANUAL_DATA_DIR, exist_ok=True)
\ No newline at end of file
+ES_INDEX_NAME = settings.es_index_name
+
+# garante que os diretórios de trabalho existam.
+# chamado explicitamente pelos pontos de entrada do pipeline, em vez de rodar
+# os syscalls de stat/mkdir a cada import do módulo
+def ensure_dirs():
+    os.makedirs(DATA_DIR, exist_ok=True)
+    os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
+    os.makedirs(MANUAL_DATA_DIR, exist_ok=True)
\ No newline at end of file
@@ -1,22 +1,56 @@
 import os
+import re
 import requests
 import logging
+import shutil
 import sys
 from bs4 import BeautifulSoup
-from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from lxml import html
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from src import config
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# extrai o nome do arquivo .xls/.xlsx da URL da CMED, tolerando query string
+# e fragmento; compilado uma única vez no import do módulo
+_CMED_FILE_RE = re.compile(r'([^/?#]+\.xlsx?)(?:$|[?#])', re.IGNORECASE)
+
+# sessão HTTP compartilhada por todas as requisições: reaproveita a conexão
+# TCP/TLS (keep-alive) em vez de pagar um novo handshake a cada chamada, e
+# reexecuta automaticamente respostas 5xx transitórias com backoff exponencial
+SESSION = requests.Session()
+# a verificação de certificado fica centralizada na sessão (os portais
+# dados.anvisa.gov.br/gov.br apresentam cadeias incompletas)
+SESSION.verify = False
+SESSION.mount('https://', HTTPAdapter(
+    max_retries=Retry(total=5, backoff_factor=1, status_forcelist=[500, 502, 503, 504]),
+    pool_connections=8,
+    pool_maxsize=16,
+))
+
 # navega na página da CMED para encontrar a URL do arquivo XLS mais recente.
 # a lógica busca por um card com o título "PMC - xls" e extrai o link pai.
 def find_cmed_xls_url():
     try:
         logger.info(f"Buscando a página de preços da CMED em: {config.CMED_PRICES_PAGE_URL}")
-        response = requests.get(config.CMED_PRICES_PAGE_URL, timeout=30, verify=False)
+        response = SESSION.get(config.CMED_PRICES_PAGE_URL, timeout=30)
         response.raise_for_status()
 
+        # o XPath do lxml localiza o link diretamente na árvore C, sem construir
+        # os objetos Python que o BeautifulSoup criaria para a página inteira
+        tree = html.fromstring(response.content)
+        hrefs = tree.xpath(
+            "//span[@class='titulo' and normalize-space()='PMC - xls']/ancestor::a[1]/@href"
+        )
+        if hrefs:
+            full_url = hrefs[0]
+            logger.info(f"URL do arquivo CMED encontrada: {full_url}")
+            return full_url
+
+        # fallback: mantém o parse antigo com BeautifulSoup caso o XPath não encontre nada
         soup = BeautifulSoup(response.content, 'lxml')
 
         target_span = soup.find('span', class_='titulo', string='PMC - xls')
@@ -43,15 +77,43 @@ def find_cmed_xls_url():
         return None
 
 # baixa um arquivo de uma URL e o salva em um caminho de destino.
-def download_file(url, destination_path):
+# quando o destino e o ETag da execução anterior existem, faz o download
+# condicional (If-None-Match): se o servidor responder 304, a transferência
+# do corpo inteiro é pulada.
+def download_file(url, destination_path, session=None):
+    http = session or SESSION
+    etag_path = destination_path + '.etag'
+
+    headers = {}
+    if os.path.exists(destination_path) and os.path.exists(etag_path):
+        try:
+            with open(etag_path, encoding='utf-8') as f:
+                cached_etag = f.read().strip()
+            if cached_etag:
+                headers['If-None-Match'] = cached_etag
+        except OSError:
+            pass
+
     try:
         logger.info(f"Iniciando download de {url}...")
-        with requests.get(url, stream=True, timeout=120, verify=False) as r:
+        with http.get(url, stream=True, timeout=120, headers=headers) as r:
+            if r.status_code == 304:
+                logger.info(f"O servidor indicou que o arquivo não mudou (304). Download pulado: {destination_path}")
+                return True
             r.raise_for_status()
             os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+            # copia o corpo da resposta direto do stream bruto em blocos de 1 MiB:
+            # o laço roda em C, com muito menos iterações e syscalls de escrita
+            # do que o iter_content de 8 KiB
+            r.raw.decode_content = True
             with open(destination_path, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
+                shutil.copyfileobj(r.raw, f, length=1024 * 1024)
+
+            # guarda o ETag para que a próxima execução possa pular o corpo
+            new_etag = r.headers.get('ETag')
+            if new_etag:
+                with open(etag_path, 'w', encoding='utf-8') as f:
+                    f.write(new_etag)
         logger.info(f"Arquivo salvo com sucesso em: {destination_path}")
         return True
     except requests.exceptions.RequestException as e:
@@ -61,30 +123,49 @@ def download_file(url, destination_path):
 # orquestra o download dos arquivos da ANVISA e da CMED.
 def run():
     logger.info("--- Iniciando Etapa de Extração de Dados ---")
+    config.ensure_dirs()
 
-    # download do arquivo da ANVISA
-    logger.info("Iniciando download do arquivo da ANVISA...")
     anvisa_filename = config.ANVISA_FILENAME
     anvisa_file_path = os.path.join(config.DATA_DIR,anvisa_filename)
 
-    if not download_file(config.ANVISA_CSV_URL, anvisa_file_path):
-        error_message = "PIPELINE INTERROMPIDO: Falha crítica no download do arquivo da ANVISA. A extração não pode ser concluída."
-        logger.critical(error_message)
-        raise RuntimeError(error_message)
+    # o download da ANVISA e a busca pela URL da CMED são independentes,
+    # então rodam em paralelo para que as duas transferências se sobreponham
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        logger.info("Iniciando download do arquivo da ANVISA...")
+        anvisa_future = executor.submit(download_file, config.ANVISA_CSV_URL, anvisa_file_path, SESSION)
+
+        logger.info("Iniciando busca pela URL do arquivo da CMED...")
+        cmed_url_future = executor.submit(find_cmed_xls_url)
+
+        # assim que a URL da CMED é resolvida, o download dela é submetido
+        # enquanto o download da ANVISA ainda pode estar em andamento
+        cmed_url = cmed_url_future.result()
+        cmed_future = _submit_cmed_download(executor, cmed_url)
+
+        if not anvisa_future.result():
+            error_message = "PIPELINE INTERROMPIDO: Falha crítica no download do arquivo da ANVISA. A extração não pode ser concluída."
+            logger.critical(error_message)
+            raise RuntimeError(error_message)
+
+        logger.info("Download do arquivo da ANVISA concluído com sucesso.")
 
-    logger.info("Download do arquivo da ANVISA concluído com sucesso.")
+        if cmed_future is not None:
+            if not cmed_future.result():
+                error_message = "PIPELINE INTERROMPIDO: Falha crítica no download do arquivo da CMED."
+                logger.critical(error_message)
+                raise RuntimeError(error_message)
+            logger.info("Download do arquivo da CMED concluído com sucesso.")
 
-    # download do arquivo da CMED
-    logger.info("Iniciando busca pela URL do arquivo da CMED...")
-    # primeiro, encontra a URL
-    cmed_url = find_cmed_xls_url()
+    logger.info("--- Etapa de Extração de Dados Concluída com Sucesso ---")
 
+# valida a URL da CMED e submete o download ao executor, se necessário.
+# retorna o future do download ou None quando o arquivo já existe no destino.
+def _submit_cmed_download(executor, cmed_url):
     # prossegue com o download apenas se a URL foi encontrada
     if cmed_url:
-        # parseia a URL para obter seus componentes e procura o nome do arquivo dinamicamente
-        parsed_url = urlparse(cmed_url)
-        path_components = parsed_url.path.split('/')
-        cmed_filename = next((part for part in path_components if part.endswith(('.xls', '.xlsx'))), None)
+        # procura o nome do arquivo diretamente na URL com o padrão pré-compilado
+        match = _CMED_FILE_RE.search(cmed_url)
+        cmed_filename = match.group(1) if match else None
 
         if not cmed_filename:
             error_message = f"PIPELINE INTERROMPIDO: Não foi possível extrair um nome de arquivo .xls/.xlsx da URL: {cmed_url}"
@@ -95,33 +176,30 @@ def run():
 
         if os.path.exists(cmed_file_path):
             logger.info(f"O arquivo '{cmed_filename}' já existe no destino. Download pulado.")
-        else:
-            logger.info(f"Nova versão do arquivo CMED detectada: '{cmed_filename}'.")
+            return None
 
-            # procura e remove qualquer versão antiga do arquivo CMED antes de baixar a nova.
-            logger.info("Procurando por versões antigas para remover...")
-            for filename_in_dir in os.listdir(config.DATA_DIR):
-                if filename_in_dir.startswith('xls_conformidade_site_') and filename_in_dir.endswith(('.xls', '.xlsx')):
-                    old_file_path = os.path.join(config.DATA_DIR, filename_in_dir)
+        logger.info(f"Nova versão do arquivo CMED detectada: '{cmed_filename}'.")
+
+        # procura e remove qualquer versão antiga do arquivo CMED antes de baixar a nova.
+        # os.scandir devolve DirEntry com tipo e caminho já resolvidos, evitando
+        # o stat extra por arquivo que o os.listdir exigiria
+        logger.info("Procurando por versões antigas para remover...")
+        with os.scandir(config.DATA_DIR) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.startswith('xls_conformidade_site_') and entry.name.endswith(('.xls', '.xlsx')):
                     try:
-                        os.remove(old_file_path)
-                        logger.info(f"Arquivo antigo '{filename_in_dir}' removido com sucesso.")
+                        os.remove(entry.path)
+                        logger.info(f"Arquivo antigo '{entry.name}' removido com sucesso.")
                     except OSError as e:
-                        logger.error(f"Erro ao remover o arquivo antigo '{filename_in_dir}': {e}")
+                        logger.error(f"Erro ao remover o arquivo antigo '{entry.name}': {e}")
 
-            logger.info(f"Iniciando download de '{cmed_filename}'...")
-            if not download_file(cmed_url, cmed_file_path):
-                error_message = "PIPELINE INTERROMPIDO: Falha crítica no download do arquivo da CMED."
-                logger.critical(error_message)
-                raise RuntimeError(error_message)
-            logger.info("Download do arquivo da CMED concluído com sucesso.")
+        logger.info(f"Iniciando download de '{cmed_filename}'...")
+        return executor.submit(download_file, cmed_url, cmed_file_path, SESSION)
     else:
         error_message = "PIPELINE INTERROMPIDO: Não foi possível obter a URL do arquivo da CMED. A extração não pode ser concluída."
         logger.critical(error_message)
         raise RuntimeError(error_message)
 
-    logger.info("--- Etapa de Extração de Dados Concluída com Sucesso ---")
-
 if __name__ == '__main__':
     try:
         run()
@@ -1,13 +1,21 @@
+import io
 import logging
+import numpy as np
 import pandas as pd
 import time
-from sqlalchemy import create_engine, text
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from sqlalchemy import Column, MetaData, Table, create_engine, text
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.schema import CreateTable
 from sqlalchemy.types import (
-    String, Text, BigInteger, Numeric, Boolean
+    String, Text, BigInteger, Boolean
 )
-from elasticsearch import Elasticsearch, helpers
+import orjson
+from elasticsearch import Elasticsearch, NotFoundError
 from elasticsearch.helpers import BulkIndexError
+from elasticsearch.serializer import JSONSerializer
 from src import config
 
 # Configuração do sistema de logging para monitorizar a execução.
@@ -15,90 +23,273 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(level
 logger = logging.getLogger(__name__)
 
 
+class OrjsonSerializer(JSONSerializer):
+    """
+    Serializador JSON do cliente Elasticsearch baseado em orjson, que codifica
+    os documentos em C e aceita tipos NumPy diretamente — o json da stdlib
+    domina o tempo de CPU durante o bulk com centenas de milhares de _source.
+    """
+    mimetype = "application/json"
+
+    def dumps(self, data):
+        if isinstance(data, (str, bytes)):
+            return data
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+# Mapeamento explícito de tipos de dados do Pandas para tipos SQL.
+# Garante a integridade dos dados e otimiza o armazenamento.
+_BASE_DTYPE_MAPPING = {
+    "NUMERO_REGISTRO_PRODUTO": String(13),
+    "CLASSE_TERAPEUTICA": Text,
+    "PRINCIPIO_ATIVO": Text,
+    "LABORATORIO": Text,
+    "CNPJ": String(14),
+    "REGISTRO_CMED": String(20),
+    "PRODUTO": Text,
+    "APRESENTACAO": Text,
+    "TIPO_PRODUTO": String(50),
+    "TARJA": String(50),
+    "CODIGO_GGREM": BigInteger,
+    "REGIME_DE_PRECO": String(50),
+    "RESTRICAO_HOSPITALAR": Boolean,
+    "LISTA_DE_CONCESSAO_DE_CREDITO_TRIBUTARIO_PIS_COFINS": String(10),
+}
+
+
+def _column_type(name: str):
+    """
+    Resolve o tipo SQL de uma coluna. As colunas de preço chegam quantizadas
+    em centavos (int64) pelo run() e são armazenadas como BIGINT.
+    """
+    if name.startswith('PRECO_MAXIMO_AO_CONSUMIDOR'):
+        return BigInteger
+    return _BASE_DTYPE_MAPPING.get(name, Text)
+
+
+@lru_cache(maxsize=8)
+def _table_columns_ddl(columns: tuple) -> str:
+    """
+    Compila (e memoiza) o trecho de colunas do CREATE TABLE para o dialeto
+    PostgreSQL a partir do mapeamento de tipos. O schema é fixo por execução,
+    então a introspecção do DataFrame que o pandas refaria a cada carga é
+    substituída por uma string pré-computada.
+    """
+    table = Table(
+        '_schema_template',
+        MetaData(),
+        *[Column(name, _column_type(name)) for name in columns],
+    )
+    ddl = str(CreateTable(table).compile(dialect=postgresql.dialect()))
+    return ddl[ddl.index('('):]
+
+
+@lru_cache(maxsize=8)
+def _price_columns(columns: tuple) -> tuple:
+    """
+    Identifica (e memoiza) as colunas de preço de um conjunto de colunas, para
+    que a varredura por prefixo não se repita em cada etapa da carga.
+    """
+    return tuple(col for col in columns if col.startswith('PRECO_MAXIMO_AO_CONSUMIDOR'))
+
+
+# Engine e cliente compartilhados pelo módulo: cada create_engine monta um novo
+# pool de conexões e cada Elasticsearch() refaz o handshake inicial, custo puro
+# quando a carga é invocada mais de uma vez no mesmo processo.
+_ENGINE = None
+_ES = None
+
+
+def _get_engine():
+    """Cria (uma única vez) e devolve o engine SQLAlchemy com pool reutilizável."""
+    global _ENGINE
+    if _ENGINE is None:
+        _ENGINE = create_engine(config.DATABASE_URL, pool_pre_ping=True, pool_size=8, max_overflow=4)
+    return _ENGINE
+
+
+def _get_es():
+    """Cria (uma única vez) e devolve o cliente Elasticsearch compartilhado."""
+    global _ES
+    if _ES is None:
+        _ES = Elasticsearch(
+            config.ES_URL,
+            http_compress=True,
+            request_timeout=120,
+            serializer=OrjsonSerializer(),
+        )
+    return _ES
+
+
+# tamanho-alvo de cada corpo _bulk enviado ao Elasticsearch
+_BULK_FLUSH_BYTES = 50 * 1024 * 1024
+
+
+# número de requisições _bulk em voo simultaneamente; o cliente solta o GIL
+# durante o I/O de rede, então a serialização do próximo lote sobrepõe o envio
+_BULK_THREADS = 4
+
+
+def _bulk_index_dataframe(es, index_name: str, df: pd.DataFrame, ids):
+    """
+    Indexa um DataFrame pelo endpoint _bulk montando o corpo NDJSON diretamente
+    em bytes com orjson. Cada documento vira um par de linhas header/_source já
+    serializado, sem os dicionários de ação intermediários dos helpers nem a
+    validação por documento do cliente. Os lotes prontos são enviados em
+    paralelo por um pequeno pool de threads, preenchendo a fila de indexação do
+    Elasticsearch enquanto o lote seguinte ainda é serializado. Lança
+    BulkIndexError se o Elasticsearch rejeitar algum documento.
+    """
+    columns = df.columns.tolist()
+    rows = df.to_numpy(copy=False)
+    dumps = orjson.dumps
+
+    errors = []
+
+    def send(payload):
+        response = es.perform_request(
+            'POST',
+            f'/{index_name}/_bulk',
+            headers={'content-type': 'application/x-ndjson', 'accept': 'application/json'},
+            body=payload,
+        )
+        body = response.body
+        if body.get('errors'):
+            errors.extend(item for item in body['items'] if item['index'].get('error'))
+
+    futures = []
+    with ThreadPoolExecutor(max_workers=_BULK_THREADS) as executor:
+        buffer = bytearray()
+        for doc_id, row in zip(ids, rows):
+            buffer += dumps({"index": {"_id": doc_id}})
+            buffer += b'\n'
+            buffer += dumps(dict(zip(columns, row)), option=orjson.OPT_SERIALIZE_NUMPY)
+            buffer += b'\n'
+            if len(buffer) >= _BULK_FLUSH_BYTES:
+                futures.append(executor.submit(send, bytes(buffer)))
+                buffer = bytearray()
+        if buffer:
+            futures.append(executor.submit(send, bytes(buffer)))
+
+        for future in as_completed(futures):
+            future.result()
+
+    if errors:
+        raise BulkIndexError(f"{len(errors)} documento(s) falharam ao indexar.", errors)
+
+
+# número de linhas serializadas por lote no COPY: limita o pico de memória da
+# representação CSV intermediária independentemente do tamanho do DataFrame
+_COPY_CHUNK_ROWS = 100_000
+
+
+def _copy_dataframe(connection, df: pd.DataFrame, table_name: str):
+    """
+    Transmite o conteúdo de um DataFrame para uma tabela já existente via
+    COPY ... FROM STDIN, serializando as linhas como CSV em lotes.
+    Usa o cursor DBAPI da conexão recebida; a transação é gerida pelo chamador.
+    """
+    columns = ', '.join(f'"{col}"' for col in df.columns)
+    copy_sql = f'COPY "{table_name}" ({columns}) FROM STDIN WITH (FORMAT csv)'
+
+    with connection.connection.cursor() as cursor:
+        for start in range(0, len(df), _COPY_CHUNK_ROWS):
+            buffer = io.StringIO()
+            df.iloc[start:start + _COPY_CHUNK_ROWS].to_csv(buffer, index=False, header=False, na_rep='')
+            buffer.seek(0)
+            cursor.copy_expert(copy_sql, buffer)
+
+
 def load_to_postgres(df: pd.DataFrame):
     """
     Carrega os dados de um DataFrame para uma tabela no PostgreSQL.
     Utiliza uma estratégia de "blue-green deployment": os dados são carregados
-    numa tabela temporária e depois movidos para a tabela principal
-    dentro de uma transação atómica para garantir zero downtime.
+    numa tabela temporária, que então assume o lugar da principal por um RENAME
+    atómico — uma troca só de metadados, sem reescrever as linhas — garantindo
+    zero downtime.
     """
     if df.empty:
         logger.warning("O DataFrame está vazio. Nenhum dado será carregado no PostgreSQL.")
         return
 
-    # Mapeamento explícito de tipos de dados do Pandas para tipos SQL.
-    # Garante a integridade dos dados e otimiza o armazenamento.
-    dtype_mapping = {
-        "NUMERO_REGISTRO_PRODUTO": String(13),
-        "CLASSE_TERAPEUTICA": Text,
-        "PRINCIPIO_ATIVO": Text,
-        "LABORATORIO": Text,
-        "CNPJ": String(14),
-        "REGISTRO_CMED": String(20),
-        "PRODUTO": Text,
-        "APRESENTACAO": Text,
-        "TIPO_PRODUTO": String(50),
-        "TARJA": String(50),
-        "CODIGO_GGREM": BigInteger,
-        "REGIME_DE_PRECO": String(50),
-        "RESTRICAO_HOSPITALAR": Boolean,
-        "LISTA_DE_CONCESSAO_DE_CREDITO_TRIBUTARIO_PIS_COFINS": String(10),
-    }
-
-    # Mapeia dinamicamente todas as colunas de preço para o tipo Numeric.
-    price_cols = [col for col in df.columns if col.startswith('PRECO_MAXIMO_AO_CONSUMIDOR')]
-    for col in price_cols:
-        dtype_mapping[col] = Numeric(10, 2)
-
     # Gera um nome único para a tabela temporária usando um timestamp.
     temp_table_name = f"{config.DB_TABLE_NAME}_temp_{int(time.time())}"
 
     try:
         logger.info(f"Conectando ao banco de dados PostgreSQL em {config.DB_HOST}...")
-        engine = create_engine(config.DATABASE_URL)
+        engine = _get_engine()
 
         # Converte a coluna de restrição hospitalar para o tipo booleano.
+        # A comparação vetorizada roda em uma única passada em C, e o assign
+        # devolve um novo frame em vez de mutar o DataFrame do chamador — que
+        # está sendo consumido em paralelo pela carga do Elasticsearch.
         if 'RESTRICAO_HOSPITALAR' in df.columns:
-            df['RESTRICAO_HOSPITALAR'] = df['RESTRICAO_HOSPITALAR'].apply(lambda x: True if x == 'Sim' else False)
-
-        logger.info(f"Carregando dados na tabela temporária: {temp_table_name}")
-        # Realiza a carga inicial dos dados para a tabela temporária.
-        df.to_sql(
-            temp_table_name,
-            engine,
-            if_exists='replace',  # Garante que a tabela temp seja sempre nova.
-            index=False,
-            dtype=dtype_mapping,
-            chunksize=1000  # Processa a carga em lotes para otimizar o uso de memória.
-        )
-
-        # Inicia uma transação para garantir que a substituição seja atómica.
-        # Ou todas as operações são bem-sucedidas, ou nenhuma é aplicada.
+            df = df.assign(RESTRICAO_HOSPITALAR=df['RESTRICAO_HOSPITALAR'].eq('Sim'))
+
+        # Colunas declaradas BIGINT no DDL precisam chegar ao COPY como
+        # inteiros: basta uma célula vazia para o pandas promover a coluna a
+        # float64, e o to_csv emitiria "526915090113317.0" — que o COPY
+        # rejeita para bigint. O Int64 (inteiro anulável) mantém os ausentes
+        # como campo vazio no CSV.
+        int_cols = [
+            col for col in df.columns
+            if _column_type(col) is BigInteger and df[col].dtype != 'Int64'
+        ]
+        if int_cols:
+            df = df.assign(**{
+                col: pd.to_numeric(df[col], errors='coerce').round().astype('Int64')
+                for col in int_cols
+            })
+
+        # Toda a carga roda em uma única transação: um único par de flushes de
+        # WAL, e ou todas as operações são bem-sucedidas, ou nenhuma é aplicada.
         with engine.begin() as connection:
-            logger.info("Iniciando transação para substituir a tabela principal.")
-            # 1. Garante que a tabela principal exista, copiando a estrutura da temporária.
-            connection.execute(text(f'CREATE TABLE IF NOT EXISTS "{config.DB_TABLE_NAME}" (LIKE "{temp_table_name}")'))
-
-            # 2. Remove a chave primária antiga para evitar conflitos.
-            # Esta é a correção crucial para permitir reexecuções do pipeline.
+            # Amplia a memória de manutenção da sessão para acelerar a
+            # construção do índice único da chave primária.
+            connection.execute(text("SET LOCAL maintenance_work_mem = '1GB'"))
+
+            logger.info(f"Carregando dados na tabela temporária: {temp_table_name}")
+            # Cria a tabela temporária vazia com o DDL pré-compilado do schema e
+            # depois transmite os dados pelo caminho de carga em massa do
+            # PostgreSQL (COPY), que evita o parse/plan de milhares de INSERTs.
+            # UNLOGGED: a tabela é descartável, então a escrita em WAL durante o
+            # COPY — o custo dominante da carga — é dispensada.
+            connection.execute(text(f'DROP TABLE IF EXISTS "{temp_table_name}"'))
             connection.execute(
-                text(f'ALTER TABLE "{config.DB_TABLE_NAME}" DROP CONSTRAINT IF EXISTS "{config.DB_TABLE_NAME}_pkey"'))
+                text(f'CREATE UNLOGGED TABLE "{temp_table_name}" {_table_columns_ddl(tuple(df.columns))}'))
+            _copy_dataframe(connection, df, temp_table_name)
+
+            logger.info("Iniciando a substituição da tabela principal.")
+            # 1. Constrói a chave primária ainda na tabela temporária, que não
+            # tem leitores concorrentes.
+            logger.info(f"Definindo 'REGISTRO_CMED' como chave primária.")
+            connection.execute(text(f'ALTER TABLE "{temp_table_name}" ADD PRIMARY KEY ("REGISTRO_CMED")'))
 
-            # 3. Limpa a tabela principal de forma eficiente.
-            connection.execute(text(f'TRUNCATE TABLE "{config.DB_TABLE_NAME}"'))
+            # 2. Religa a escrita em WAL agora que a carga e o índice estão prontos.
+            connection.execute(text(f'ALTER TABLE "{temp_table_name}" SET LOGGED'))
 
-            # 4. Insere os novos dados da tabela temporária na principal.
-            connection.execute(text(f'INSERT INTO "{config.DB_TABLE_NAME}" SELECT * FROM "{temp_table_name}"'))
+            # 3. Troca atómica, puramente de metadados: a temporária assume o
+            # nome da principal sem que nenhuma linha seja reescrita. O lock
+            # exclusivo dura apenas os RENAMEs, mantendo o zero downtime.
+            old_table_name = f"{config.DB_TABLE_NAME}_old"
+            connection.execute(text(f'DROP TABLE IF EXISTS "{old_table_name}"'))
+            connection.execute(
+                text(f'ALTER TABLE IF EXISTS "{config.DB_TABLE_NAME}" RENAME TO "{old_table_name}"'))
+            connection.execute(text(f'ALTER TABLE "{temp_table_name}" RENAME TO "{config.DB_TABLE_NAME}"'))
 
-            # 5. Recria a chave primária para garantir a integridade e performance das consultas.
-            logger.info(f"Definindo 'REGISTRO_CMED' como chave primária.")
-            connection.execute(text(f'ALTER TABLE "{config.DB_TABLE_NAME}" ADD PRIMARY KEY ("REGISTRO_CMED");'))
+            # 4. Remove a versão anterior da tabela antes de renomear a
+            # constraint: o índice dela ainda ocupa o nome "<principal>_pkey".
+            logger.info(f"Removendo a versão anterior da tabela: {old_table_name}")
+            connection.execute(text(f'DROP TABLE IF EXISTS "{old_table_name}"'))
 
-            logger.info("Tabela principal atualizada com sucesso.")
+            connection.execute(
+                text(f'ALTER TABLE "{config.DB_TABLE_NAME}" '
+                     f'RENAME CONSTRAINT "{temp_table_name}_pkey" TO "{config.DB_TABLE_NAME}_pkey"'))
 
-            # 6. Remove a tabela temporária após o sucesso da operação.
-            logger.info(f"Removendo tabela temporária: {temp_table_name}")
-            connection.execute(text(f'DROP TABLE "{temp_table_name}"'))
+            logger.info("Tabela principal atualizada com sucesso.")
 
         logger.info(f"{len(df)} registros carregados com sucesso no PostgreSQL.")
 
@@ -114,6 +305,22 @@ def load_to_postgres(df: pd.DataFrame):
         raise
 
 
+def _current_index_matches(es, alias_name: str, content_hash: str) -> bool:
+    """
+    Verifica se algum índice atrás do alias foi construído a partir do mesmo
+    conteúdo, comparando o hash gravado no _meta do mapeamento.
+    """
+    try:
+        mappings = es.indices.get_mapping(index=alias_name)
+    except NotFoundError:
+        return False
+    for index_mapping in mappings.values():
+        meta = index_mapping.get('mappings', {}).get('_meta', {})
+        if meta.get('content_hash') == content_hash:
+            return True
+    return False
+
+
 def load_to_elasticsearch(df: pd.DataFrame):
     """
     Carrega os dados de um DataFrame para o Elasticsearch.
@@ -125,11 +332,8 @@ def load_to_elasticsearch(df: pd.DataFrame):
         logger.warning("O DataFrame está vazio. Nenhum dado será carregado no Elasticsearch.")
         return
 
-    # 1. Cria uma cópia do DataFrame para isolar as modificações.
-    df_es = df.copy()
-
-    # 2. Define a lista de campos a serem removidos.
-    cols_to_remove = [
+    # 1. Define a lista de campos que não vão para o motor de busca.
+    cols_to_remove = {
         'CLASSE_TERAPEUTICA',
         'CNPJ',
         'CODIGO_GGREM',
@@ -139,27 +343,38 @@ def load_to_elasticsearch(df: pd.DataFrame):
         'REGISTRO_CMED',
         'RESTRICAO_HOSPITALAR',
         'TARJA',
-        'TIPO_PRODUTO'
-    ]
-
-    # 3. Guarda os IDs dos documentos, pois a coluna será removida.
-    cmed_ids = df_es['REGISTRO_CMED']
+        'TIPO_PRODUTO',
+    }
 
-    # 4. Remove as colunas especificadas do DataFrame.
-    df_es = df_es.drop(columns=cols_to_remove, errors='ignore')
-    logger.info(f"Removidas {len(cols_to_remove)} colunas da cópia para o Elasticsearch.")
+    # 2. Guarda os IDs dos documentos, pois a coluna não é indexada.
+    cmed_ids = df['REGISTRO_CMED']
 
-    # 5. Identifica e remove as colunas de preço da cópia.
-    price_cols_to_drop = [col for col in df_es.columns if col.startswith('PRECO_MAXIMO_AO_CONSUMIDOR')]
-    if price_cols_to_drop:
-        df_es = df_es.drop(columns=price_cols_to_drop)
-        logger.info(f"Removidas {len(price_cols_to_drop)} colunas de preço da cópia para o Elasticsearch.")
+    # 3. Projeta apenas as colunas mantidas (os campos excluídos e as colunas
+    # de preço ficam de fora): evita a cópia profunda do DataFrame inteiro,
+    # que dobrava o pico de memória durante a fase de indexação.
+    price_cols = set(_price_columns(tuple(df.columns)))
+    keep_cols = [
+        col for col in df.columns
+        if col not in cols_to_remove and col not in price_cols
+    ]
+    df_es = df.loc[:, keep_cols]
+    logger.info(f"Projeção para o Elasticsearch mantém {len(keep_cols)} de {len(df.columns)} colunas.")
 
     logger.info("Criando campo 'PRINCIPIO_ATIVO_UNICO' para otimização de busca.")
-    df_es['PRINCIPIO_ATIVO_UNICO'] = ~df_es['PRINCIPIO_ATIVO'].str.contains('+', regex=False, na=True)
+    # np.char.find varre o array inteiro em C, sem o dispatch Python por
+    # elemento do acessor .str; valores ausentes viram '+' para preservar a
+    # semântica anterior (NaN conta como princípio ativo composto).
+    principios = df['PRINCIPIO_ATIVO'].fillna('+').to_numpy(dtype=str)
+    df_es = df_es.assign(PRINCIPIO_ATIVO_UNICO=np.char.find(principios, '+') == -1)
 
     # Mapeamento otimizado para autocomplete.
     es_settings = {
+        # Durante a carga o índice ainda não é servido: desligar o refresh e as
+        # réplicas elimina flushes de segmento por segundo e a amplificação de
+        # escrita da replicação. Os valores de serviço são restaurados após o bulk.
+        "refresh_interval": "-1",
+        "number_of_replicas": 0,
+        "translog": {"durability": "async"},
         "analysis": {
             "analyzer": {
                 "brazilian_folding": {
@@ -218,34 +433,60 @@ def load_to_elasticsearch(df: pd.DataFrame):
 
     try:
         logger.info(f"Conectando ao Elasticsearch em {config.ES_URL}...")
-        es = Elasticsearch(config.ES_URL)
+        es = _get_es()
+
+        # Impressão digital do conteúdo: se o índice servido pelo alias foi
+        # construído a partir de dados idênticos, a reindexação inteira é
+        # pulada. O hash é gravado no _meta do mapeamento do novo índice.
+        content_hash = (
+            f"{int(pd.util.hash_pandas_object(df_es, index=False).sum()):016x}"
+            f"-{int(pd.util.hash_pandas_object(cmed_ids, index=False).sum()):016x}"
+        )
+        if _current_index_matches(es, alias_name, content_hash):
+            logger.info("O índice atual já contém exatamente estes dados. Reindexação pulada.")
+            return
+        es_mapping["_meta"] = {"content_hash": content_hash}
 
         logger.info(f"Criando o novo índice '{new_index_name}' com mapeamento explícito.")
         es.indices.create(index=new_index_name, mappings=es_mapping, settings=es_settings)
 
-        # Prepara os documentos para a indexação em massa (bulk), usando os IDs salvos.
-        actions = [
-            {
-                "_index": new_index_name,
-                "_id": cmed_id,
-                "_source": record
-            }
-            for cmed_id, record in zip(cmed_ids, df_es.to_dict(orient='records'))
-        ]
-
-        df_es_size_mb = df_es.memory_usage(deep=True).sum() / (1024 * 1024)
-        logger.info(f"Tamanho do DataFrame em memória para indexação: {df_es_size_mb:.2f} MB.")
-
-        logger.info(f"Indexando {len(actions)} documentos em '{new_index_name}'...")
-        helpers.bulk(es, actions)
+        # memory_usage(deep=True) percorre cada string do DataFrame e custa
+        # segundos em frames grandes; o cálculo só roda quando o log DEBUG
+        # realmente vai ser emitido.
+        if logger.isEnabledFor(logging.DEBUG):
+            df_es_size_mb = df_es.memory_usage(deep=True).sum() / (1024 * 1024)
+            logger.debug(f"Tamanho do DataFrame em memória para indexação: {df_es_size_mb:.2f} MB.")
+
+        # Indexa escrevendo o NDJSON do _bulk diretamente: os documentos são
+        # pré-serializados com orjson e enviados em lotes de ~50 MB, usando os
+        # IDs salvos; apenas o lote corrente fica em memória.
+        logger.info(f"Indexando {len(df_es)} documentos em '{new_index_name}'...")
+        _bulk_index_dataframe(es, new_index_name, df_es, cmed_ids)
         logger.info("Dados indexados com sucesso no novo índice.")
 
+        # Restaura as configurações de serviço e compacta os segmentos gerados
+        # pela carga antes de expor o índice pelo alias.
+        es.indices.put_settings(
+            index=new_index_name,
+            body={
+                "refresh_interval": "1s",
+                "number_of_replicas": 1,
+                # volta o translog ao modo durável: o "async" da carga não
+                # pode acompanhar o índice em produção
+                "index.translog.durability": "request",
+            },
+        )
+        es.indices.forcemerge(index=new_index_name, max_num_segments=1)
+
         # Realiza a troca atómica do alias para o novo índice.
         logger.info(f"Atualizando o alias '{alias_name}' para apontar para '{new_index_name}'.")
-        old_indices = []
-        if es.indices.exists_alias(name=alias_name):
-            alias_info = es.indices.get_alias(name=alias_name)
-            old_indices = list(alias_info.keys())
+        # Uma única chamada resolve os índices atuais do alias; a ausência do
+        # alias vira NotFoundError em vez de custar um round-trip exists_alias
+        # extra a cada execução.
+        try:
+            old_indices = list(es.indices.get_alias(name=alias_name))
+        except NotFoundError:
+            old_indices = []
 
         # Prepara as ações de remoção do alias dos índices antigos e adição ao novo.
         alias_actions = {
@@ -259,10 +500,16 @@ def load_to_elasticsearch(df: pd.DataFrame):
         # Executa a atualização do alias de forma atómica.
         es.indices.update_aliases(body=alias_actions)
 
-        # Remove os índices antigos que já não estão em uso.
-        for old_index in old_indices:
-            logger.info(f"Deletando índice antigo: {old_index}")
-            es.indices.delete(index=old_index)
+        # Remove os índices antigos que já não estão em uso. A troca do alias
+        # já aconteceu, então os deletes saem do caminho crítico e rodam em
+        # paralelo — o tempo total passa a ser o do delete mais lento.
+        if old_indices:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                def _delete_old_index(old_index):
+                    logger.info(f"Deletando índice antigo: {old_index}")
+                    es.indices.delete(index=old_index, ignore_unavailable=True)
+
+                list(executor.map(_delete_old_index, old_indices))
 
         logger.info("Alias atualizado e índices antigos removidos.")
 
@@ -275,7 +522,7 @@ def load_to_elasticsearch(df: pd.DataFrame):
         raise
     except Exception as e:
         logger.critical(f"Falha ao carregar dados para o Elasticsearch: {e}", exc_info=True)
-        es = Elasticsearch(config.ES_URL)
+        es = _get_es()
         es.indices.delete(index=new_index_name, ignore_unavailable=True)
         raise
 
@@ -285,9 +532,25 @@ def run(df: pd.DataFrame):
     Orquestra a execução da etapa de carga para todos os sistemas de destino.
     """
     logger.info("--- Iniciando Etapa de Carga de Dados ---")
+
+    # Quantiza as colunas de preço para centavos (Int64) uma única vez, antes
+    # de despachar para os destinos: inteiros são mais baratos de serializar e
+    # de armazenar do que floats/decimais, e o buffer é reaproveitado pelas
+    # duas cargas.
+    for col in _price_columns(tuple(df.columns)):
+        df[col] = (pd.to_numeric(df[col], errors='coerce') * 100).round().astype('Int64')
+
     try:
-        load_to_postgres(df)
-        load_to_elasticsearch(df)
+        # Os dois destinos são independentes e limitados por I/O de rede, então
+        # as cargas rodam em paralelo: o tempo total passa a ser o da mais lenta,
+        # não a soma das duas.
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [
+                executor.submit(load_to_postgres, df),
+                executor.submit(load_to_elasticsearch, df),
+            ]
+            for future in as_completed(futures):
+                future.result()
         logger.info("--- Etapa de Carga de Dados Concluída com Sucesso ---")
     except Exception as e:
         logger.critical(f"Ocorreu um erro durante a etapa de carga: {e}", exc_info=True)
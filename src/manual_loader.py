@@ -1,3 +1,4 @@
+import io
 import logging
 import os
 import pandas as pd
@@ -12,28 +13,63 @@ from src import config
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Tipos pandas esperados para o CSV de alíquotas de ICMS, chaveados pelo
+# nome da coluna em maiúsculas.
+_CSV_DTYPES = {
+    'ID': 'int64',
+    'UF': 'string',
+    'ESTADO': 'string',
+    'ALIQUOTA': 'float64',
+    'GENERICO': 'bool',
+}
+
+# Quantidade de linhas do CSV processadas por bloco durante a carga.
+_CSV_CHUNK_ROWS = 10_000
+
+# Engine compartilhado pelo módulo, criado sob demanda na primeira carga.
+_ENGINE = None
+
+
+def _get_engine():
+    """
+    Retorna o engine do SQLAlchemy, criando-o apenas na primeira chamada.
+    Cargas subsequentes no mesmo processo reaproveitam o pool de conexões
+    em vez de pagar um novo create_engine por arquivo.
+    """
+    global _ENGINE
+    if _ENGINE is None:
+        _ENGINE = create_engine(config.DATABASE_URL)
+    return _ENGINE
+
 
 def load_manual_data(csv_filename: str, db_identifier: str):
     """
     Orquestra a carga de um arquivo CSV manual para o PostgreSQL.
     """
     logger.info(f"--- Iniciando Carga de Dados Manuais: {csv_filename} ---")
+    config.ensure_dirs()
 
     try:
         file_path = os.path.join(config.MANUAL_DATA_DIR, csv_filename)
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Arquivo não encontrado: {file_path}.")
 
-        df = pd.read_csv(file_path)
-        if df.empty:
-            logger.warning("DataFrame vazio. Nenhuma carga será realizada.")
+        # Tipos declarados antecipadamente: o parser grava direto nos arrays
+        # finais, sem a passada extra de inferência de dtype por coluna.
+        # O cabeçalho é lido primeiro (nrows=0) para casar os nomes sem
+        # depender da caixa usada no arquivo.
+        header = pd.read_csv(file_path, nrows=0).columns
+        dtypes = {col: _CSV_DTYPES[col.upper()] for col in header if col.upper() in _CSV_DTYPES}
+
+        # O arquivo é lido em blocos e cada bloco vai direto para a tabela
+        # temporária, de modo que o pico de memória fica limitado ao tamanho
+        # de um bloco e não ao arquivo inteiro.
+        chunks = pd.read_csv(file_path, dtype=dtypes, chunksize=_CSV_CHUNK_ROWS)
+        total_rows = _load_to_postgres(chunks, db_identifier)
+        if total_rows == 0:
+            logger.warning("Arquivo sem registros. Nenhuma carga será realizada.")
             return
 
-        # Garante que os nomes das colunas estejam em maiúsculas para consistência.
-        df.columns = [col.upper() for col in df.columns]
-
-        _load_to_postgres(df, db_identifier)
-
         logger.info(f"--- Carga de '{csv_filename}' Concluída com Sucesso ---")
 
     except Exception as e:
@@ -41,10 +77,29 @@ def load_manual_data(csv_filename: str, db_identifier: str):
         raise
 
 
-def _load_to_postgres(df: pd.DataFrame, table_name: str):
+def _copy_chunk(connection, chunk: pd.DataFrame, table_name: str):
     """
-    Carrega dados de um DataFrame para o PostgreSQL usando a estratégia
+    Envia um bloco do DataFrame para a tabela via COPY FROM STDIN.
+    O COPY ingere o CSV num único comando no protocolo do Postgres,
+    eliminando o custo por linha dos INSERTs do to_sql.
+    """
+    buffer = io.StringIO()
+    chunk.to_csv(buffer, index=False, header=False, na_rep='')
+    buffer.seek(0)
+    column_list = ', '.join(f'"{col}"' for col in chunk.columns)
+    copy_sql = f'COPY "{table_name}" ({column_list}) FROM STDIN WITH (FORMAT csv)'
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(copy_sql, buffer)
+    finally:
+        cursor.close()
+
+
+def _load_to_postgres(chunks, table_name: str) -> int:
+    """
+    Carrega blocos de um DataFrame para o PostgreSQL usando a estratégia
     de tabela temporária para garantir uma atualização sem indisponibilidade.
+    Recebe um iterável de DataFrames e retorna o total de linhas carregadas.
     """
     # Mapeamento de tipos para a tabela de alíquotas de ICMS.
     dtype_mapping = {
@@ -58,41 +113,60 @@ def _load_to_postgres(df: pd.DataFrame, table_name: str):
 
     try:
         logger.info("Conectando ao PostgreSQL...")
-        engine = create_engine(config.DATABASE_URL)
+        engine = _get_engine()
 
         logger.info(f"Carregando dados na tabela temporária: {temp_table_name}")
-        df.to_sql(temp_table_name, engine, if_exists='replace', index=False, dtype=dtype_mapping)
+        total_rows = 0
+        with engine.begin() as connection:
+            for chunk in chunks:
+                # Um CSV só com cabeçalho produz um único bloco vazio; ignorá-lo
+                # evita criar uma tabela temporária que ficaria órfã no banco.
+                if chunk.empty:
+                    continue
+                # Garante que os nomes das colunas estejam em maiúsculas para consistência.
+                chunk.columns = [col.upper() for col in chunk.columns]
+                if total_rows == 0:
+                    # O primeiro bloco cria a tabela vazia com os tipos do
+                    # dtype_mapping; as linhas em si entram sempre via COPY.
+                    chunk.head(0).to_sql(
+                        temp_table_name, connection, if_exists='replace', index=False, dtype=dtype_mapping
+                    )
+                _copy_chunk(connection, chunk, temp_table_name)
+                total_rows += len(chunk)
+
+        if total_rows == 0:
+            return 0
 
         # Inicia transação atómica para substituir os dados.
         with engine.begin() as connection:
             logger.info("Iniciando transação para substituir a tabela principal.")
-            # 1. Garante a existência da tabela principal.
-            connection.execute(text(f'CREATE TABLE IF NOT EXISTS "{table_name}" (LIKE "{temp_table_name}")'))
+            # 1. Define a chave primária ainda na tabela temporária.
+            logger.info(f"Definindo 'ID' como chave primária na tabela '{temp_table_name}'.")
+            connection.execute(text(f'ALTER TABLE "{temp_table_name}" ADD PRIMARY KEY ("ID")'))
 
-            # 2. Remove a chave primária antiga para permitir a recriação.
-            connection.execute(text(f'ALTER TABLE "{table_name}" DROP CONSTRAINT IF EXISTS "{table_name}_pkey"'))
+            # 2. Troca atómica, puramente de metadados: a temporária assume o
+            # nome da principal sem que nenhuma linha seja reescrita.
+            old_table_name = f"{table_name}_old"
+            connection.execute(text(f'DROP TABLE IF EXISTS "{old_table_name}"'))
+            connection.execute(text(f'ALTER TABLE IF EXISTS "{table_name}" RENAME TO "{old_table_name}"'))
+            connection.execute(text(f'ALTER TABLE "{temp_table_name}" RENAME TO "{table_name}"'))
 
-            # 3. Limpa a tabela principal.
-            connection.execute(text(f'TRUNCATE TABLE "{table_name}"'))
+            # 3. Remove a versão anterior antes de renomear a constraint: o
+            # índice dela ainda ocupa o nome "<principal>_pkey".
+            connection.execute(text(f'DROP TABLE IF EXISTS "{old_table_name}"'))
 
-            # 4. Insere os novos dados.
-            connection.execute(text(f'INSERT INTO "{table_name}" SELECT * FROM "{temp_table_name}"'))
-
-            # 5. Define a nova chave primária.
-            logger.info(f"Definindo 'ID' como chave primária na tabela '{table_name}'.")
-            connection.execute(text(f'ALTER TABLE "{table_name}" ADD PRIMARY KEY ("ID");'))
+            connection.execute(
+                text(f'ALTER TABLE "{table_name}" '
+                     f'RENAME CONSTRAINT "{temp_table_name}_pkey" TO "{table_name}_pkey"'))
 
             logger.info("Tabela principal atualizada com sucesso.")
 
-            # 6. Remove a tabela temporária.
-            logger.info(f"Removendo tabela temporária: {temp_table_name}")
-            connection.execute(text(f'DROP TABLE "{temp_table_name}"'))
-
-        logger.info(f"{len(df)} registros carregados com sucesso em '{table_name}'.")
+        logger.info(f"{total_rows} registros carregados com sucesso em '{table_name}'.")
+        return total_rows
 
     except Exception as e:
         logger.critical(f"Falha ao carregar dados para '{table_name}': {e}", exc_info=True)
-        with engine.connect() as connection:
+        with _get_engine().connect() as connection:
             connection.execute(text(f'DROP TABLE IF EXISTS "{temp_table_name}"'))
             connection.commit()
         raise
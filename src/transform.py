@@ -1,88 +1,129 @@
 import os
 import pandas as pd
 import logging
-import glob
 import numpy as np
+import pyarrow as pa
+from concurrent.futures import ThreadPoolExecutor
+from pyarrow import csv as pacsv
+from pyarrow import parquet as pq
 from src import config
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# colunas da base da ANVISA realmente usadas pelo pipeline; o resto do CSV
+# (dezenas de colunas) nem chega a ser convertido na leitura
+ANVISA_USECOLS = [
+    'NUMERO_REGISTRO_PRODUTO',
+    'CLASSE_TERAPEUTICA',
+    'PRINCIPIO_ATIVO',
+]
+
 # encontra o arquivo XLS mais recente da CMED no diretório de dados brutos
 def find_latest_cmed_file():
-    search_pattern = os.path.join(config.DATA_DIR, '*.xls*')
-    files = glob.glob(search_pattern)
-    if not files:
+    # uma única passada com os.scandir: o DirEntry traz o stat em cache,
+    # evitando o stat extra por arquivo que o glob + getmtime faria
+    latest_file = None
+    latest_mtime = float('-inf')
+    with os.scandir(config.DATA_DIR) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.endswith(('.xls', '.xlsx')):
+                mtime = entry.stat().st_mtime
+                if mtime > latest_mtime:
+                    latest_mtime = mtime
+                    latest_file = entry.path
+    if latest_file is None:
         return None
-    # Encontra o arquivo mais recente baseado no tempo de modificação
-    latest_file = max(files, key=os.path.getmtime)
     logger.info(f"Arquivo CMED encontrado: {latest_file}")
     return latest_file
 
+# renomeia os cabeçalhos originais da planilha da CMED para os nomes usados
+# pelo restante do pipeline
+CMED_COL_RENAME = {
+    'LABORATÓRIO': 'LABORATORIO',
+    'REGISTRO': 'REGISTRO_CMED',
+    'APRESENTAÇÃO': 'APRESENTACAO',
+    'TIPO DE PRODUTO (STATUS DO PRODUTO)': 'TIPO_PRODUTO',
+    'CÓDIGO GGREM': 'CODIGO_GGREM',
+    'REGIME DE PREÇO': 'REGIME_DE_PRECO',
+    'PMC Sem Impostos': 'PRECO_MAXIMO_AO_CONSUMIDOR_SEM_IMPOSTOS',
+    'PMC 0 %': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_SEM_ICMS',
+    'PMC 12 %': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_12',
+    'PMC 12 %  ALC': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_12_AREA_DE_LIVRE_COMERCIO',
+    'PMC 17 %': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_17',
+    'PMC 17 %  ALC': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_17_AREA_DE_LIVRE_COMERCIO',
+    'PMC 17,5 %': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_17_5',
+    'PMC 17,5 %  ALC': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_17_5_AREA_DE_LIVRE_COMERCIO',
+    'PMC 18 %': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_18',
+    'PMC 18 %  ALC': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_18_AREA_DE_LIVRE_COMERCIO',
+    'PMC 19 %': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_19',
+    'PMC 19 %  ALC': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_19_AREA_DE_LIVRE_COMERCIO',
+    'PMC 19,5 %': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_19_5',
+    'PMC 20 %': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_20',
+    'PMC 20 %  ALC': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_20_AREA_DE_LIVRE_COMERCIO',
+    'PMC 20,5 %': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_20_5',
+    'PMC 20,5 %  ALC': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_20_5_AREA_DE_LIVRE_COMERCIO',
+    'PMC 21 %': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_21',
+    'PMC 21 %  ALC': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_21_AREA_DE_LIVRE_COMERCIO',
+    'PMC 22 %': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_22',
+    'PMC 22 %  ALC': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_22_AREA_DE_LIVRE_COMERCIO',
+    'PMC 22,5 %': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_22_5',
+    'PMC 22,5 %  ALC': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_22_5_AREA_DE_LIVRE_COMERCIO',
+    'PMC 23 %': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_23',
+    'PMC 23 %  ALC': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_23_AREA_DE_LIVRE_COMERCIO',
+    'RESTRIÇÃO HOSPITALAR': 'RESTRICAO_HOSPITALAR',
+    'LISTA DE CONCESSÃO DE CRÉDITO TRIBUTÁRIO (PIS/COFINS)': 'LISTA_DE_CONCESSAO_DE_CREDITO_TRIBUTARIO_PIS_COFINS',
+}
+
+# cabeçalhos da planilha da CMED que realmente interessam (nomes originais
+# e nomes que já vêm limpos); usado para pular as demais colunas na leitura
+CMED_RAW_USECOLS = frozenset(CMED_COL_RENAME) | {'CNPJ', 'PRODUTO', 'TARJA'}
+
+# remove tudo que não é dígito de uma série de identificadores.
+# centraliza a regra usada para registros e CNPJ; a substituição roda no
+# kernel de regex compilado do Arrow
+def _strip_non_digits(series):
+    return series.astype('string[pyarrow]').str.replace(r'\D', '', regex=True)
+
 # limpa e padroniza o DataFrame de dados da ANVISA
 def clean_anvisa_data(df):
     logger.info("Iniciando limpeza dos dados da ANVISA.")
-    anvisa_cols = [
-        'NUMERO_REGISTRO_PRODUTO',
-        'CLASSE_TERAPEUTICA',
-        'PRINCIPIO_ATIVO',
-    ]
+    cols_to_use = [col for col in ANVISA_USECOLS if col in df.columns]
+    # projeção sem .copy(): com copy-on-write os blocos são compartilhados e
+    # só as colunas realmente alteradas adiante são materializadas
+    df = df.loc[:, cols_to_use]
 
-    cols_to_use = [col for col in anvisa_cols if col in df.columns]
-    df = df[cols_to_use].copy()
+    # converte as colunas textuais para o dtype string do Arrow: as operações
+    # .str passam a rodar nos kernels nativos do pyarrow, em vez de objeto a
+    # objeto no interpretador
+    text_cols = df.select_dtypes(include=['object']).columns
+    if len(text_cols):
+        df[text_cols] = df[text_cols].astype('string[pyarrow]')
 
     # converte para string, remove não-dígitos e trunca para 9 caracteres
     if 'NUMERO_REGISTRO_PRODUTO' in df.columns:
-        df['NUMERO_REGISTRO_PRODUTO'] = df['NUMERO_REGISTRO_PRODUTO'].astype(str).str.replace(r'\D', '', regex=True)
-        df.dropna(subset=['NUMERO_REGISTRO_PRODUTO'], inplace=True)
-        df['NUMERO_REGISTRO_PRODUTO'] = df['NUMERO_REGISTRO_PRODUTO'].str.slice(0, 9)
+        registros = _strip_non_digits(df['NUMERO_REGISTRO_PRODUTO'])
+        # uma única máscara descarta tanto os registros ausentes quanto os que
+        # ficaram vazios após a limpeza (o dropna anterior não pegava esses)
+        df = df.loc[registros.ne('').fillna(False)]
+        df['NUMERO_REGISTRO_PRODUTO'] = registros.loc[df.index].str.slice(0, 9)
 
     # remove espaços em branco extras das colunas de texto
-    for col in df.select_dtypes(include=['object']).columns:
+    for col in df.select_dtypes(include=['string']).columns:
         df[col] = df[col].str.strip()
 
+    # coluna de baixa cardinalidade: category troca as strings repetidas por
+    # códigos inteiros, como já é feito nas colunas equivalentes da CMED
+    if 'CLASSE_TERAPEUTICA' in df.columns:
+        df['CLASSE_TERAPEUTICA'] = df['CLASSE_TERAPEUTICA'].astype('category')
+
     logger.info("Limpeza dos dados da ANVISA concluída.")
     return df
 
 # limpa e padroniza o DataFrame de dados da CMED
 def clean_cmed_data(df):
     logger.info("Iniciando limpeza dos dados da CMED.")
-    cmed_col_rename = {
-        'LABORATÓRIO': 'LABORATORIO',
-        'REGISTRO': 'REGISTRO_CMED',
-        'APRESENTAÇÃO': 'APRESENTACAO',
-        'TIPO DE PRODUTO (STATUS DO PRODUTO)': 'TIPO_PRODUTO',
-        'CÓDIGO GGREM': 'CODIGO_GGREM',
-        'REGIME DE PREÇO': 'REGIME_DE_PRECO',
-        'PMC Sem Impostos': 'PRECO_MAXIMO_AO_CONSUMIDOR_SEM_IMPOSTOS',
-        'PMC 0 %': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_SEM_ICMS',
-        'PMC 12 %': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_12',
-        'PMC 12 %  ALC': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_12_AREA_DE_LIVRE_COMERCIO',
-        'PMC 17 %': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_17',
-        'PMC 17 %  ALC': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_17_AREA_DE_LIVRE_COMERCIO',
-        'PMC 17,5 %': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_17_5',
-        'PMC 17,5 %  ALC': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_17_5_AREA_DE_LIVRE_COMERCIO',
-        'PMC 18 %': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_18',
-        'PMC 18 %  ALC': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_18_AREA_DE_LIVRE_COMERCIO',
-        'PMC 19 %': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_19',
-        'PMC 19 %  ALC': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_19_AREA_DE_LIVRE_COMERCIO',
-        'PMC 19,5 %': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_19_5',
-        'PMC 20 %': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_20',
-        'PMC 20 %  ALC': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_20_AREA_DE_LIVRE_COMERCIO',
-        'PMC 20,5 %': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_20_5',
-        'PMC 20,5 %  ALC': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_20_5_AREA_DE_LIVRE_COMERCIO',
-        'PMC 21 %': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_21',
-        'PMC 21 %  ALC': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_21_AREA_DE_LIVRE_COMERCIO',
-        'PMC 22 %': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_22',
-        'PMC 22 %  ALC': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_22_AREA_DE_LIVRE_COMERCIO',
-        'PMC 22,5 %': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_22_5',
-        'PMC 22,5 %  ALC': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_22_5_AREA_DE_LIVRE_COMERCIO',
-        'PMC 23 %': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_23',
-        'PMC 23 %  ALC': 'PRECO_MAXIMO_AO_CONSUMIDOR_PERCENTUAL_23_AREA_DE_LIVRE_COMERCIO',
-        'RESTRIÇÃO HOSPITALAR': 'RESTRICAO_HOSPITALAR',
-        'LISTA DE CONCESSÃO DE CRÉDITO TRIBUTÁRIO (PIS/COFINS)': 'LISTA_DE_CONCESSAO_DE_CREDITO_TRIBUTARIO_PIS_COFINS',
-    }
-    df = df.rename(columns=cmed_col_rename)
+    df = df.rename(columns=CMED_COL_RENAME)
 
     cmed_cols = [
         'LABORATORIO',
@@ -123,7 +164,14 @@ def clean_cmed_data(df):
         'LISTA_DE_CONCESSAO_DE_CREDITO_TRIBUTARIO_PIS_COFINS',
     ]
     cols_to_use = [col for col in cmed_cols if col in df.columns]
-    df = df[cols_to_use].copy()
+    # mesma projeção sem cópia profunda usada na limpeza da ANVISA
+    df = df.loc[:, cols_to_use]
+
+    # mesmo racional da limpeza da ANVISA: strings no dtype do Arrow para que
+    # replace/strip/slice rodem nos kernels nativos do pyarrow
+    text_cols = df.select_dtypes(include=['object']).columns
+    if len(text_cols):
+        df[text_cols] = df[text_cols].astype('string[pyarrow]')
 
     price_cols = [
         'PRECO_MAXIMO_AO_CONSUMIDOR_SEM_IMPOSTOS',
@@ -156,9 +204,18 @@ def clean_cmed_data(df):
     # Remove asteriscos e converte colunas de preço para numérico
     logger.info("Removendo asteriscos e convertendo colunas de preço para numérico.")
     for col in price_cols:
-        if col in df.columns:
-            # O parâmetro 'coerce' transforma valores inválidos (ex: vazios) em NaN (Not a Number)
-            df[col] = pd.to_numeric(df[col].astype(str).str.replace('*', '', regex=False).str.replace(',', '.', regex=False), errors='coerce')
+        if col not in df.columns:
+            continue
+        # o calamine costuma entregar essas colunas já como float; nesse caso
+        # a limpeza de '*' e vírgula seria uma ida e volta por string à toa
+        if pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+            continue
+        # O parâmetro 'coerce' transforma valores inválidos (ex: vazios) em NaN (Not a Number).
+        # Os preços ficam em float64 de propósito: em float32 os valores altos
+        # carregam erro maior que meio centavo, e a carga poderia errar o
+        # centavo ao multiplicar por 100 e arredondar.
+        df[col] = pd.to_numeric(df[col].astype('string[pyarrow]').str.replace('*', '', regex=False).str.replace(',', '.', regex=False), errors='coerce')
 
     # Remove linhas onde nenhum preço foi declarado
     linhas_antes = len(df)
@@ -168,40 +225,100 @@ def clean_cmed_data(df):
     logger.info(f"{linhas_antes - linhas_depois} linhas removidas por não conterem valores de preço.")
 
     if 'REGISTRO_CMED' in df.columns:
-        df['REGISTRO_CMED'] = df['REGISTRO_CMED'].astype(str).str.replace(r'\D', '', regex=True)
-        df.dropna(subset=['REGISTRO_CMED'], inplace=True)
+        registros = _strip_non_digits(df['REGISTRO_CMED'])
+        # mesma máscara única usada na ANVISA: elimina ausentes e vazios
+        df = df.loc[registros.ne('').fillna(False)]
+        df['REGISTRO_CMED'] = registros.loc[df.index]
         # cria uma coluna base para o merge, com os 9 primeiros dígitos
         df['REGISTRO_BASE'] = df['REGISTRO_CMED'].str.slice(0, 9)
 
     # Limpa a coluna CNPJ, removendo caracteres não numéricos
     if 'CNPJ' in df.columns:
         logger.info("Limpando a coluna CNPJ.")
-        df['CNPJ'] = df['CNPJ'].astype(str).str.replace(r'\D', '', regex=True)
+        df['CNPJ'] = _strip_non_digits(df['CNPJ'])
 
     # remove espaços em branco extras das colunas de texto
-    for col in df.select_dtypes(include=['object']).columns:
+    for col in df.select_dtypes(include=['string']).columns:
         if col != 'REGISTRO_BASE':
             df[col] = df[col].str.strip()
 
+    # colunas de baixa cardinalidade viram category: cada valor repetido passa
+    # a ser um código inteiro apontando para um dicionário pequeno de rótulos
+    low_cardinality_cols = [
+        'TIPO_PRODUTO',
+        'TARJA',
+        'REGIME_DE_PRECO',
+        'RESTRICAO_HOSPITALAR',
+        'LISTA_DE_CONCESSAO_DE_CREDITO_TRIBUTARIO_PIS_COFINS',
+    ]
+    for col in low_cardinality_cols:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
     logger.info("Limpeza dos dados da CMED concluída.")
     return df
 
 # realiza o merge dos dataframes da ANVISA e CMED
 def merge_datasets(anvisa_df, cmed_df):
     logger.info("Iniciando a unificação dos datasets.")
+
+    # fatoriza as duas chaves sobre um vocabulário único: o merge compara
+    # códigos int32 contíguos em vez de strings, e as colunas originais
+    # seguem intactas no resultado
+    left_keys = anvisa_df['NUMERO_REGISTRO_PRODUTO'].astype('object')
+    right_keys = cmed_df['REGISTRO_BASE'].astype('object')
+    codes, _ = pd.factorize(pd.concat([left_keys, right_keys], ignore_index=True))
+    codes = codes.astype('int32', copy=False)
+    anvisa_df = anvisa_df.assign(_k=codes[:len(left_keys)])
+    cmed_df = cmed_df.assign(_k=codes[len(left_keys):])
+
     merged_df = pd.merge(
         anvisa_df,
         cmed_df,
-        left_on='NUMERO_REGISTRO_PRODUTO',
-        right_on='REGISTRO_BASE',
+        on='_k',
         how='inner' # 'inner' join para manter apenas os registros que existem em ambas as bases
-    )
+    ).drop(columns='_k')
     logger.info(f"Unificação concluída. {len(merged_df)} registros correspondentes encontrados.")
     return merged_df
 
+# carrega o CSV da ANVISA e aplica a limpeza, para rodar numa thread própria
+def _load_and_clean_anvisa(anvisa_path):
+    logger.info(f"Carregando dados da ANVISA de: {anvisa_path}")
+    # o leitor CSV do pyarrow faz o parse multi-thread em C e converte
+    # apenas as colunas usadas; as colunas de texto viram string[pyarrow]
+    # sem cópia, no mesmo dtype que a limpeza já espera
+    anvisa_table = pacsv.read_csv(
+        anvisa_path,
+        read_options=pacsv.ReadOptions(encoding='latin1'),
+        parse_options=pacsv.ParseOptions(delimiter=';'),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=ANVISA_USECOLS,
+            include_missing_columns=True,
+        ),
+    )
+    df_anvisa = anvisa_table.to_pandas(types_mapper={pa.string(): pd.StringDtype('pyarrow')}.get)
+    return clean_anvisa_data(df_anvisa)
+
+# carrega a planilha da CMED e aplica a limpeza, para rodar numa thread própria
+def _load_and_clean_cmed(cmed_path):
+    logger.info(f"Carregando dados da CMED de: {cmed_path}")
+    # pula as primeiras linhas que são cabeçalho no arquivo da CMED.
+    # o engine calamine (Rust) lê a planilha inteira de uma vez, várias
+    # vezes mais rápido que o parser XML célula a célula do openpyxl;
+    # usecols descarta as colunas não usadas ainda na leitura, antes de
+    # qualquer conversão para pandas
+    df_cmed = pd.read_excel(
+        cmed_path,
+        skiprows=41,
+        engine='calamine',
+        usecols=lambda name: str(name).strip() in CMED_RAW_USECOLS,
+    )
+    return clean_cmed_data(df_cmed)
+
 # orquestra o processo de transformação: carregar, limpar, unificar e salvar os dados
 def run():
     logger.info("--- Iniciando Etapa de Transformação de Dados ---")
+    config.ensure_dirs()
 
     anvisa_path = os.path.join(config.DATA_DIR, config.ANVISA_FILENAME)
     cmed_path = find_latest_cmed_file()
@@ -212,20 +329,18 @@ def run():
         raise FileNotFoundError(error_message)
 
     try:
-        logger.info(f"Carregando dados da ANVISA de: {anvisa_path}")
-        df_anvisa = pd.read_csv(anvisa_path, sep=';', encoding='latin1', low_memory=False)
-
-        logger.info(f"Carregando dados da CMED de: {cmed_path}")
-        # pula as primeiras linhas que são cabeçalho no arquivo da CMED
-        df_cmed = pd.read_excel(cmed_path, skiprows=41)
+        # as duas fontes são independentes até o merge, então carga e limpeza
+        # de cada uma rodam em threads paralelas; os parsers do pyarrow e do
+        # calamine liberam o GIL, permitindo sobreposição real
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            anvisa_future = executor.submit(_load_and_clean_anvisa, anvisa_path)
+            cmed_future = executor.submit(_load_and_clean_cmed, cmed_path)
+            df_anvisa_clean = anvisa_future.result()
+            df_cmed_clean = cmed_future.result()
     except Exception as e:
         logger.critical(f"Falha ao carregar os dados brutos: {e}", exc_info=True)
         raise
 
-    # limpeza e padronização
-    df_anvisa_clean = clean_anvisa_data(df_anvisa)
-    df_cmed_clean = clean_cmed_data(df_cmed)
-
     # unificação
     df_unified = merge_datasets(df_anvisa_clean, df_cmed_clean)
 
@@ -278,15 +393,31 @@ def run():
     final_columns_exist = [col for col in final_columns if col in df_unified.columns]
     df_final = df_unified[final_columns_exist]
 
-    df_final = df_final.where(pd.notna(df_final), None)
-    df_final = df_final.where(pd.notna(df_final), None)
+    # volta para dtype object antes do where: nos dtypes do Arrow o None
+    # viraria pd.NA de novo, e a carga espera None para valores ausentes
+    df_final = df_final.astype(object).where(pd.notna(df_final), None)
 
     # salvando o resultado ---
     output_path = os.path.join(config.PROCESSED_DATA_DIR, config.UNIFIED_FILENAME)
     try:
         logger.info(f"Salvando arquivo unificado em: {output_path}")
-        df_final.to_csv(output_path, index=False, sep=';', encoding='utf-8-sig')
+        # o writer CSV do pyarrow serializa em C e em paralelo; o BOM é
+        # gravado à mão para manter a saída idêntica ao encoding utf-8-sig
+        output_table = pa.Table.from_pandas(df_final, preserve_index=False)
+        with open(output_path, 'wb') as f:
+            f.write(b'\xef\xbb\xbf')
+            pacsv.write_csv(
+                output_table,
+                f,
+                write_options=pacsv.WriteOptions(delimiter=';', quoting_style='needed'),
+            )
         logger.info(f"Arquivo '{config.UNIFIED_FILENAME}' salvo com sucesso.")
+
+        # grava o mesmo resultado também em Parquet comprimido com zstd:
+        # consumidores posteriores releem os dados tipados, sem novo parse de CSV
+        parquet_path = os.path.join(config.PROCESSED_DATA_DIR, config.UNIFIED_PARQUET_FILENAME)
+        pq.write_table(output_table, parquet_path, compression='zstd')
+        logger.info(f"Arquivo '{config.UNIFIED_PARQUET_FILENAME}' salvo com sucesso.")
     except Exception as e:
         logger.critical(f"Falha ao salvar o arquivo processado: {e}", exc_info=True)
         raise